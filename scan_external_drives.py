@@ -4,13 +4,21 @@ ARCHIVIS Phase 1: External Drive Scanner
 Automatically detects, names, and scans external drives on macOS.
 """
 
+import ctypes
+import errno
 import json
 import os
+import queue
+import struct
 import subprocess
 import sys
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import AbstractSet, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from xml.parsers.expat import ExpatError
 import plistlib
 
 
@@ -22,22 +30,420 @@ SNAPSHOTS_DIR = BASE_DIR / "snapshots"
 NOTES_DIR = BASE_DIR / "notes"
 
 NAMING_RULES_FILE = CONFIG_DIR / "naming_rules.json"
+SCAN_RULES_FILE = CONFIG_DIR / "scan_rules.json"
 DRIVES_REGISTRY_FILE = REGISTRY_DIR / "drives.json"
 
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Volume topology rarely changes between back-to-back runs, so the parsed
+# `diskutil list` output is cached. Within the TTL the cache is used as-is;
+# up to the max staleness it is used while a background refresh runs. Any
+# mount or unmount touches /Volumes and invalidates the cache immediately.
+DISKUTIL_CACHE_FILE = Path.home() / ".cache" / "archivis" / "diskutil.plist"
+DISKUTIL_CACHE_TTL = 10
+DISKUTIL_CACHE_MAX_STALE = 60
+VOLUMES_DIR = "/Volumes"
+
+# Concurrent `diskutil info` processes when `info -all` is unavailable
+MAX_DISKUTIL_WORKERS = 16
+
+# Directory scanning is dominated by blocking stat/readdir syscalls, which
+# release the GIL, so a thread pool overlaps them effectively. Each scan
+# keeps only a few listings per worker in flight and holds the rest of the
+# frontier on a stack, so the walk stays close to depth-first and its
+# memory follows tree depth rather than tree size.
+MAX_SCAN_WORKERS = (os.cpu_count() or 1) * 2
+MAX_DIRS_IN_FLIGHT = MAX_SCAN_WORKERS * 4
+
+# Permission-denied directories are summarised after each scan; this many
+# are listed by path
+MAX_PERMISSION_ERRORS_SHOWN = 5
+
+_scan_executor = ThreadPoolExecutor(max_workers=MAX_SCAN_WORKERS)
+
+# Metadata and tooling directories that hold huge numbers of small files
+# with no archival value; they are never descended into. Override with
+# "skip_dirs" in scan_rules.json.
+SKIP_DIRS = frozenset({
+    '.Trashes',
+    '.Spotlight-V100',
+    '.fseventsd',
+    '.DocumentRevisions-V100',
+    '.TemporaryItems',
+    'node_modules',
+    '.git',
+    '__pycache__',
+})
+
+
+# getattrlistbulk(2) returns names, types and sizes for a whole directory
+# per syscall on macOS, instead of one stat() per file.
+ATTR_BIT_MAP_COUNT = 5
+ATTR_CMN_NAME = 0x00000001
+ATTR_CMN_DEVID = 0x00000002
+ATTR_CMN_OBJTYPE = 0x00000008
+ATTR_CMN_FILEID = 0x02000000
+ATTR_CMN_ERROR = 0x20000000
+ATTR_CMN_RETURNED_ATTRS = 0x80000000
+ATTR_FILE_LINKCOUNT = 0x00000001
+ATTR_FILE_DATALENGTH = 0x00000200
+VREG = 1
+VDIR = 2
+BULK_BUFFER_SIZE = 64 * 1024
+
+# (name, is_dir, size_bytes, inode_key); inode_key is only set for files
+# with more than one hard link
+DirEntryInfo = Tuple[str, bool, int, Optional[Tuple[int, int]]]
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO 8601 string, e.g. 2025-01-15T14:22:00Z."""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def _run_diskutil_list() -> bytes:
+    """Run `diskutil list -plist` and store its output in the cache."""
+    result = subprocess.run(
+        ['diskutil', 'list', '-plist'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=True
+    )
+
+    try:
+        DISKUTIL_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = DISKUTIL_CACHE_FILE.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_file.write_bytes(result.stdout)
+        os.replace(tmp_file, DISKUTIL_CACHE_FILE)
+    except OSError:
+        # The cache is only an optimisation
+        pass
+
+    return result.stdout
+
+
+def _refresh_diskutil_cache():
+    """Refresh the diskutil cache in the background, ignoring failures."""
+    try:
+        _run_diskutil_list()
+    except (subprocess.CalledProcessError, OSError):
+        pass
+
+
+def _cached_diskutil_list() -> Dict:
+    """
+    Get the parsed `diskutil list -plist` output, served from cache when recent.
+
+    Returns:
+        Parsed diskutil disk list
+    """
+    try:
+        cache_mtime = DISKUTIL_CACHE_FILE.stat().st_mtime
+        volumes_mtime = os.stat(VOLUMES_DIR).st_mtime
+        cached = DISKUTIL_CACHE_FILE.read_bytes()
+    except OSError:
+        cached = None
+
+    if cached is not None and volumes_mtime <= cache_mtime:
+        age = time.time() - cache_mtime
+        if 0 <= age <= DISKUTIL_CACHE_MAX_STALE:
+            try:
+                disk_list = plistlib.loads(cached)
+            except (ValueError, ExpatError):
+                disk_list = None
+
+            if disk_list is not None:
+                if age > DISKUTIL_CACHE_TTL:
+                    # Serve the stale copy; the refresh finishes before exit
+                    threading.Thread(target=_refresh_diskutil_cache).start()
+                return disk_list
+
+    return plistlib.loads(_run_diskutil_list())
+
+
+class _AttrList(ctypes.Structure):
+    """struct attrlist from <sys/attr.h>."""
+    _fields_ = [
+        ('bitmapcount', ctypes.c_ushort),
+        ('reserved', ctypes.c_uint16),
+        ('commonattr', ctypes.c_uint32),
+        ('volattr', ctypes.c_uint32),
+        ('dirattr', ctypes.c_uint32),
+        ('fileattr', ctypes.c_uint32),
+        ('forkattr', ctypes.c_uint32),
+    ]
+
+
+_BULK_ATTRS = _AttrList(
+    bitmapcount=ATTR_BIT_MAP_COUNT,
+    commonattr=(ATTR_CMN_RETURNED_ATTRS | ATTR_CMN_NAME | ATTR_CMN_ERROR |
+                ATTR_CMN_DEVID | ATTR_CMN_OBJTYPE | ATTR_CMN_FILEID),
+    fileattr=ATTR_FILE_LINKCOUNT | ATTR_FILE_DATALENGTH,
+)
+
+_getattrlistbulk = None
+if sys.platform == 'darwin':
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _getattrlistbulk = _libc.getattrlistbulk
+        _getattrlistbulk.argtypes = [
+            ctypes.c_int, ctypes.POINTER(_AttrList), ctypes.c_void_p,
+            ctypes.c_size_t, ctypes.c_uint64
+        ]
+        _getattrlistbulk.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        # Pre-10.10 macOS has no getattrlistbulk
+        _getattrlistbulk = None
+
+
+def _parse_bulk_entries(buffer: bytes, count: int) -> List[DirEntryInfo]:
+    """
+    Parse packed getattrlistbulk records for regular files and directories.
+
+    Args:
+        buffer: Raw attribute buffer filled by getattrlistbulk
+        count: Number of records in the buffer
+
+    Returns:
+        List of (name, is_dir, size_bytes, inode_key) tuples
+    """
+    entries = []
+    offset = 0
+
+    for _ in range(count):
+        entry_length, = struct.unpack_from('=I', buffer, offset)
+        field = offset + 4
+
+        # attribute_set_t of the attributes actually returned
+        common, _vol, _dir, file_attrs, _fork = struct.unpack_from('=5I', buffer, field)
+        field += 20
+
+        error = 0
+        if common & ATTR_CMN_ERROR:
+            error, = struct.unpack_from('=I', buffer, field)
+            field += 4
+
+        name = None
+        if common & ATTR_CMN_NAME:
+            # attrreference_t offset is relative to the reference itself
+            name_offset, name_length = struct.unpack_from('=iI', buffer, field)
+            name_start = field + name_offset
+            name = os.fsdecode(buffer[name_start:name_start + name_length].rstrip(b'\0'))
+            field += 8
+
+        dev = 0
+        if common & ATTR_CMN_DEVID:
+            dev, = struct.unpack_from('=i', buffer, field)
+            field += 4
+
+        obj_type = None
+        if common & ATTR_CMN_OBJTYPE:
+            obj_type, = struct.unpack_from('=I', buffer, field)
+            field += 4
+
+        ino = 0
+        if common & ATTR_CMN_FILEID:
+            ino, = struct.unpack_from('=Q', buffer, field)
+            field += 8
+
+        link_count = 1
+        if file_attrs & ATTR_FILE_LINKCOUNT:
+            link_count, = struct.unpack_from('=I', buffer, field)
+            field += 4
+
+        size = 0
+        if file_attrs & ATTR_FILE_DATALENGTH:
+            size, = struct.unpack_from('=q', buffer, field)
+            field += 8
+
+        offset += entry_length
+
+        if error or name is None:
+            # Skip items we can't access
+            continue
+        if obj_type == VREG:
+            inode_key = (dev, ino) if link_count > 1 else None
+            entries.append((name, False, size, inode_key))
+        elif obj_type == VDIR:
+            entries.append((name, True, 0, None))
+
+    return entries
+
+
+def _scandir_entries(path: str) -> List[DirEntryInfo]:
+    """
+    List regular files and directories with os.scandir.
+
+    Where supported, the directory is scanned through an open descriptor so
+    each entry is stat'ed with fstatat relative to it, rather than resolving
+    the full path from the volume root for every file.
+    """
+    if os.scandir not in os.supports_fd:
+        return _scandir_entries_from(path)
+
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    try:
+        return _scandir_entries_from(fd)
+    finally:
+        os.close(fd)
+
+
+def _scandir_entries_from(target) -> List[DirEntryInfo]:
+    """List regular files and directories in a directory path or descriptor."""
+    entries = []
+
+    with os.scandir(target) as it:
+        for entry in it:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    inode_key = (st.st_dev, st.st_ino) if st.st_nlink > 1 else None
+                    entries.append((entry.name, False, st.st_size, inode_key))
+                elif entry.is_dir(follow_symlinks=False):
+                    entries.append((entry.name, True, 0, None))
+            except OSError:
+                # Skip items we can't access
+                continue
+
+    return entries
+
+
+def _bulk_scandir(path: str) -> List[DirEntryInfo]:
+    """
+    List regular files and directories in one directory.
+
+    Uses getattrlistbulk on macOS (one syscall per buffer of entries) and
+    falls back to os.scandir elsewhere. Symlinks and special files are
+    not returned.
+
+    Args:
+        path: Directory to list
+
+    Returns:
+        List of (name, is_dir, size_bytes, inode_key) tuples
+    """
+    if _getattrlistbulk is None:
+        return _scandir_entries(path)
+
+    entries = []
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    try:
+        buffer = ctypes.create_string_buffer(BULK_BUFFER_SIZE)
+        while True:
+            count = _getattrlistbulk(fd, ctypes.byref(_BULK_ATTRS), buffer, BULK_BUFFER_SIZE, 0)
+            if count == 0:
+                break
+            if count < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOTSUP, errno.EINVAL) and not entries:
+                    # Filesystem doesn't support bulk attributes
+                    return _scandir_entries(path)
+                raise OSError(err, os.strerror(err), path)
+            entries.extend(_parse_bulk_entries(buffer.raw, count))
+    finally:
+        os.close(fd)
+
+    return entries
+
+
+def _list_directory(path: str, skip_dirs: AbstractSet[str]
+                    ) -> Tuple[int, int, List[str], List[Tuple[str, int, Tuple[int, int]]]]:
+    """
+    List a single directory without descending into subdirectories.
+
+    Files with more than one hard link are not counted here; they are
+    returned separately so the scan can charge each one exactly once.
+
+    Args:
+        path: Directory to list
+        skip_dirs: Subdirectory names to leave out entirely
+
+    Returns:
+        Tuple of (size_bytes, file_count, subdirectory_paths, linked_files),
+        where linked_files holds (name, size_bytes, inode_key) tuples
+
+    Raises:
+        OSError: If the directory itself can't be read
+    """
+    total_size = 0
+    file_count = 0
+    subdirs = []
+    linked_files = []
+
+    entries = _bulk_scandir(path)
+
+    for name, is_dir, size, inode_key in entries:
+        if is_dir:
+            if name not in skip_dirs:
+                subdirs.append(os.path.join(path, name))
+        else:
+            if inode_key is not None:
+                linked_files.append((name, size, inode_key))
+                continue
+            total_size += size
+            file_count += 1
+
+    return total_size, file_count, subdirs, linked_files
+
+
+class ScanCancelled(Exception):
+    """Raised inside a drive scan when the run has been interrupted."""
+
+
+class DirInfo(NamedTuple):
+    """A scanned directory record, as written to snapshots."""
+
+    relative_path: str
+    depth: int
+    size_bytes: int
+    file_count: int
+
+
+class _DirNode:
+    """A directory whose subtree totals are still being accumulated."""
+
+    __slots__ = ('path', 'depth', 'parent', 'size_bytes', 'file_count', 'pending', 'has_links')
+
+    def __init__(self, path: str, depth: int, parent: Optional['_DirNode']):
+        self.path = path
+        self.depth = depth
+        self.parent = parent
+        self.size_bytes = 0
+        self.file_count = 0
+        self.pending = 0
+        self.has_links = False
+
 
 class DriveScanner:
     """Handles detection, naming, and scanning of external drives."""
 
     def __init__(self):
         """Initialize the scanner and load configuration."""
-        self.naming_rules = self._load_naming_rules()
+        self._naming_rules = None
+        self.skip_dirs = self._load_scan_rules()
+        self._dirty = False
+        self._registry_lock = threading.Lock()
+        self._cancel_event = threading.Event()
         self.registry = self._load_registry()
+        self._index_registry()
+
+    @property
+    def naming_rules(self) -> Dict:
+        """Naming rules, loaded on first use since only new drives need them."""
+        if self._naming_rules is None:
+            self._naming_rules = self._load_naming_rules()
+        return self._naming_rules
 
     def _load_naming_rules(self) -> Dict:
-        """Load naming rules from config file."""
+        """
+        Load naming rules from config file.
+
+        Name pools are uppercased once here so they compare directly against
+        registry IDs; the original casing is kept in 'display_names'.
+        """
         try:
             with open(NAMING_RULES_FILE, 'r') as f:
-                return json.load(f)
+                rules = json.load(f)
         except FileNotFoundError:
             print(f"Error: {NAMING_RULES_FILE} not found.")
             sys.exit(1)
@@ -45,6 +451,32 @@ class DriveScanner:
             print(f"Error: Invalid JSON in {NAMING_RULES_FILE}: {e}")
             sys.exit(1)
 
+        display_names = {}
+        for pool in ('large_names', 'medium_names', 'small_names'):
+            for name in rules[pool]:
+                display_names.setdefault(name.upper(), name)
+            rules[pool] = [name.upper() for name in rules[pool]]
+        rules['display_names'] = display_names
+
+        return rules
+
+    def _load_scan_rules(self) -> AbstractSet[str]:
+        """
+        Load directory names to skip while scanning.
+
+        scan_rules.json is optional; without it the built-in SKIP_DIRS apply.
+        """
+        try:
+            with open(SCAN_RULES_FILE, 'r') as f:
+                rules = json.load(f)
+        except FileNotFoundError:
+            return SKIP_DIRS
+        except json.JSONDecodeError as e:
+            print(f"Error: Invalid JSON in {SCAN_RULES_FILE}: {e}")
+            sys.exit(1)
+
+        return frozenset(rules.get('skip_dirs', SKIP_DIRS))
+
     def _load_registry(self) -> Dict:
         """Load drives registry or create new one if it doesn't exist."""
         try:
@@ -60,17 +492,46 @@ class DriveScanner:
             sys.exit(1)
 
     def _save_registry(self, registry: Dict = None):
-        """Save registry to disk."""
+        """
+        Save registry to disk.
+
+        The registry is written to a temporary file and renamed into place,
+        so an interrupted write never leaves a truncated drives.json.
+        """
         if registry is None:
             registry = self.registry
 
         REGISTRY_DIR.mkdir(parents=True, exist_ok=True)
-        with open(DRIVES_REGISTRY_FILE, 'w') as f:
+        tmp_file = DRIVES_REGISTRY_FILE.with_suffix('.json.tmp')
+        with open(tmp_file, 'w') as f:
             json.dump(registry, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, DRIVES_REGISTRY_FILE)
+
+    def _flush_registry(self):
+        """Write the registry to disk if it has unsaved changes."""
+        with self._registry_lock:
+            if self._dirty:
+                self._save_registry()
+                self._dirty = False
+
+    def _index_registry(self):
+        """Build lookup indexes over registry locations by ID and volume UUID."""
+        self._by_id = {}
+        self._by_uuid = {}
+        for location in self.registry['locations']:
+            self._add_to_index(location)
+
+    def _add_to_index(self, location: Dict):
+        """Add a single registry location to the lookup indexes (first match wins)."""
+        self._by_id.setdefault(location['id'], location)
+        if location['kind'] == 'external_drive' and location.get('volume_uuid'):
+            self._by_uuid.setdefault(location['volume_uuid'], location)
 
-    def _get_used_names(self) -> set:
+    def _get_used_names(self) -> AbstractSet[str]:
         """Get set of already-used drive names."""
-        return {loc['id'] for loc in self.registry['locations']}
+        return self._by_id.keys()
 
     def _get_available_name(self, capacity_bytes: int) -> Optional[str]:
         """
@@ -98,8 +559,8 @@ class DriveScanner:
 
         # Find first available name
         for name in name_pool:
-            if name.upper() not in used_names:
-                return name
+            if name not in used_names:
+                return self.naming_rules['display_names'][name]
 
         print(f"Warning: No available names in {category} category!")
         return None
@@ -137,69 +598,120 @@ class DriveScanner:
 
             return custom_name
 
-    def get_external_drives(self) -> List[Dict]:
+    def _load_all_volume_info(self) -> Optional[Dict[str, Dict]]:
         """
-        Detect all currently mounted external drives using diskutil.
+        Fetch detailed info for every volume with a single diskutil call.
 
         Returns:
-            List of drive information dictionaries
+            Dictionary of volume info keyed by device identifier, or None if
+            this diskutil does not support `info -all` as a plist
         """
         try:
-            # Get list of all disks
             result = subprocess.run(
-                ['diskutil', 'list', '-plist'],
-                capture_output=True,
+                ['diskutil', 'info', '-plist', '-all'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 check=True
             )
-            disk_list = plistlib.loads(result.stdout)
+            all_info = plistlib.loads(result.stdout)
+        except (subprocess.CalledProcessError, ValueError, ExpatError):
+            return None
 
-            external_drives = []
+        if isinstance(all_info, dict):
+            all_info = all_info.get('AllDisks', [])
 
-            # Check each disk and its partitions/volumes
-            for disk_id in disk_list.get('AllDisksAndPartitions', []):
-                # Collect all volumes to check (both Partitions and APFSVolumes)
-                volumes_to_check = []
-                volumes_to_check.extend(disk_id.get('Partitions', []))
-                volumes_to_check.extend(disk_id.get('APFSVolumes', []))
+        volumes = {
+            info['DeviceIdentifier']: info
+            for info in all_info
+            if isinstance(info, dict) and info.get('DeviceIdentifier')
+        }
+        return volumes or None
+
+    def _load_volume_info(self, device: str) -> Dict:
+        """Fetch detailed info for a single volume."""
+        result = subprocess.run(
+            ['diskutil', 'info', '-plist', device],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True
+        )
+        return plistlib.loads(result.stdout)
+
+    def _build_drive_info(self, device: str, info: Dict) -> Optional[Dict]:
+        """
+        Build a drive information dictionary from diskutil volume info.
+
+        Args:
+            device: Device identifier (e.g. disk2s1)
+            info: Parsed `diskutil info` plist for the volume
+
+        Returns:
+            Drive information dictionary, or None if the volume is not a
+            mounted physical external drive
+        """
+        # Check if this is an external, mounted volume
+        is_external = info.get('Internal', True) == False
+        is_mounted = info.get('MountPoint', '') != ''
+        volume_name = info.get('VolumeName', '')
+
+        # Exclude disk images and virtual volumes
+        is_disk_image = info.get('DiskImageAlias') is not None
+        mount_point = info.get('MountPoint', '')
+        is_simulator = '/CoreSimulator/' in mount_point
+        is_ram_disk = info.get('RAMDisk', False)
+
+        # Only include real physical external drives
+        if not (is_external and is_mounted and volume_name and
+                not is_disk_image and not is_simulator and not is_ram_disk):
+            return None
+
+        return {
+            'device_identifier': device,
+            'volume_uuid': info.get('VolumeUUID', ''),
+            'volume_name': volume_name,
+            'mount_point': info.get('MountPoint', ''),
+            'capacity_bytes': info.get('TotalSize', 0),
+            'free_bytes': info.get('FreeSpace', 0),
+            'file_system': info.get('FilesystemType', 'unknown')
+        }
 
-                # Check each volume
-                for volume in volumes_to_check:
+    def get_external_drives(self) -> List[Dict]:
+        """
+        Detect all currently mounted external drives using diskutil.
+
+        Volume details come from one `diskutil info -all` call where
+        supported, falling back to concurrent `diskutil info` calls per volume.
+
+        Returns:
+            List of drive information dictionaries
+        """
+        try:
+            # Get list of all disks
+            disk_list = _cached_diskutil_list()
+
+            # Collect all volumes to check (both Partitions and APFSVolumes)
+            devices = []
+            for disk_id in disk_list.get('AllDisksAndPartitions', []):
+                for volume in disk_id.get('Partitions', []) + disk_id.get('APFSVolumes', []):
                     device = volume.get('DeviceIdentifier')
-                    if not device:
-                        continue
+                    if device:
+                        devices.append(device)
+
+            all_info = self._load_all_volume_info()
+            if all_info is None and devices:
+                # Fall back to one diskutil call per volume, run concurrently
+                with ThreadPoolExecutor(max_workers=min(len(devices), MAX_DISKUTIL_WORKERS)) as executor:
+                    all_info = dict(zip(devices, executor.map(self._load_volume_info, devices)))
 
-                    # Get detailed info for this volume
-                    info_result = subprocess.run(
-                        ['diskutil', 'info', '-plist', device],
-                        capture_output=True,
-                        check=True
-                    )
-                    info = plistlib.loads(info_result.stdout)
-
-                    # Check if this is an external, mounted volume
-                    is_external = info.get('Internal', True) == False
-                    is_mounted = info.get('MountPoint', '') != ''
-                    volume_name = info.get('VolumeName', '')
-
-                    # Exclude disk images and virtual volumes
-                    is_disk_image = info.get('DiskImageAlias') is not None
-                    mount_point = info.get('MountPoint', '')
-                    is_simulator = '/CoreSimulator/' in mount_point
-                    is_ram_disk = info.get('RAMDisk', False)
-
-                    # Only include real physical external drives
-                    if (is_external and is_mounted and volume_name and
-                        not is_disk_image and not is_simulator and not is_ram_disk):
-                        drive_info = {
-                            'device_identifier': device,
-                            'volume_uuid': info.get('VolumeUUID', ''),
-                            'volume_name': volume_name,
-                            'mount_point': info.get('MountPoint', ''),
-                            'capacity_bytes': info.get('TotalSize', 0),
-                            'free_bytes': info.get('FreeSpace', 0),
-                            'file_system': info.get('FilesystemType', 'unknown')
-                        }
-                        external_drives.append(drive_info)
+            external_drives = []
+            for device in devices:
+                info = all_info.get(device)
+                if info is None:
+                    continue
+
+                drive_info = self._build_drive_info(device, info)
+                if drive_info:
+                    external_drives.append(drive_info)
 
             return external_drives
 
@@ -229,26 +741,26 @@ class DriveScanner:
         if not uuid:
             return None
 
-        for location in self.registry['locations']:
-            if location['kind'] == 'external_drive':
-                if location.get('volume_uuid') == uuid:
-                    return location
-
-        return None
+        return self._by_uuid.get(uuid)
 
-    def register_new_drive(self, drive_info: Dict, name: str) -> str:
+    def register_new_drive(self, drive_info: Dict, name: str, now: Optional[str] = None) -> str:
         """
         Register a new drive in the registry.
 
+        The registry is written to disk by _flush_registry once all drives
+        are registered, before scanning starts.
+
         Args:
             drive_info: Drive information dictionary
             name: Assigned drive name (codename)
+            now: ISO timestamp to record (defaults to the current time)
 
         Returns:
             Drive ID (uppercase name)
         """
         drive_id = name.upper()
-        now = datetime.utcnow().isoformat() + 'Z'
+        if now is None:
+            now = utc_timestamp()
 
         entry = {
             'id': drive_id,
@@ -262,126 +774,180 @@ class DriveScanner:
             'status': 'active'
         }
 
-        self.registry['locations'].append(entry)
-        self._save_registry()
+        with self._registry_lock:
+            self.registry['locations'].append(entry)
+            self._add_to_index(entry)
+            self._dirty = True
 
         print(f"✓ Registered new drive: {name} ({drive_id})")
         return drive_id
 
-    def update_last_scanned(self, drive_id: str):
-        """Update the last_scanned timestamp for a drive."""
-        now = datetime.utcnow().isoformat() + 'Z'
+    def update_last_scanned(self, drive_id: str, now: Optional[str] = None):
+        """Update the last_scanned timestamp for a drive (written on flush)."""
+        if now is None:
+            now = utc_timestamp()
 
-        for location in self.registry['locations']:
-            if location['id'] == drive_id:
+        with self._registry_lock:
+            location = self._by_id.get(drive_id)
+            if location is not None:
                 location['last_scanned'] = now
-                break
-
-        self._save_registry()
+                self._dirty = True
 
-    def scan_directory_tree(self, root_path: str, max_depth: int = 2) -> List[Dict]:
+    def scan_directory_tree(self, root_path: str, max_depth: int = 2) -> Iterator[DirInfo]:
         """
         Perform shallow scan of directory tree.
 
+        Every directory on the drive, apart from those named in skip_dirs,
+        is listed exactly once on the scan thread pool. Sizes and file
+        counts roll up into the parent as each subtree completes, and
+        directories down to max_depth are yielded at that point - so
+        children are yielded before their parents.
+
+        A file with several hard links is counted once, in the directory
+        holding its lexicographically smallest path, so totals are the same
+        on every run. Directories whose subtree contains such files are
+        only final once the whole drive has been walked, and are yielded
+        last.
+
+        Other records are not buffered. The walk's own state is limited to
+        MAX_DIRS_IN_FLIGHT listings, the stack of directories waiting to be
+        listed and one entry per hardlinked file, so peak memory follows
+        tree depth and fan-out rather than the number of directories.
+
         Args:
             root_path: Root directory to scan
             max_depth: Maximum depth to scan (0 = root only)
 
-        Returns:
-            List of directory information dictionaries
+        Yields:
+            DirInfo record for each directory down to max_depth
+
+        Raises:
+            ScanCancelled: If the run is interrupted mid-scan
         """
-        directories = []
-        root = Path(root_path)
+        root_prefix = root_path.rstrip(os.sep) + os.sep
+        completed = queue.SimpleQueue()
+        in_flight = {}
+        permission_errors = []
 
-        def get_dir_size_and_files(path: Path) -> Tuple[int, int]:
-            """
-            Get total size and file count for a directory (non-recursive for size calculation).
+        # Hardlinked files: inode_key -> (smallest file path, its directory, size)
+        linked = {}
+        # Records at depth <= max_depth waiting for hard link charges, by path
+        deferred = {}
 
-            Returns:
-                Tuple of (size_bytes, file_count)
-            """
-            total_size = 0
-            file_count = 0
+        def relative_path_of(path: str) -> str:
+            return '/' if path == root_path else path[len(root_prefix):]
 
-            try:
-                for item in path.iterdir():
-                    try:
-                        if item.is_file():
-                            total_size += item.stat().st_size
-                            file_count += 1
-                        elif item.is_dir():
-                            # For directories, we'll calculate their size recursively
-                            dir_size, dir_files = get_dir_size_and_files(item)
-                            total_size += dir_size
-                            file_count += dir_files
-                    except (PermissionError, OSError):
-                        # Skip items we can't access
-                        continue
-            except (PermissionError, OSError):
-                # Can't read directory
-                pass
+        # Directories waiting to be listed, as (path, depth, parent); popped
+        # newest-first to keep the walk close to depth-first
+        waiting = [(root_path, 0, None)]
 
-            return total_size, file_count
+        def submit_waiting():
+            while waiting and len(in_flight) < MAX_DIRS_IN_FLIGHT:
+                path, depth, parent = waiting.pop()
+                future = _scan_executor.submit(_list_directory, path, self.skip_dirs)
+                in_flight[future] = _DirNode(path, depth, parent)
+                future.add_done_callback(completed.put)
 
-        def scan_recursive(current_path: Path, current_depth: int):
-            """Recursively scan directories up to max_depth."""
-            if current_depth > max_depth:
-                return
+        submit_waiting()
 
-            try:
-                # Get size and file count for this directory
-                size_bytes, file_count = get_dir_size_and_files(current_path)
+        while in_flight:
+            if self._cancel_event.is_set():
+                raise ScanCancelled(root_path)
 
-                # Calculate relative path
-                try:
-                    relative_path = str(current_path.relative_to(root))
-                    if relative_path == '.':
-                        relative_path = '/'
-                except ValueError:
-                    relative_path = str(current_path)
-
-                # Add directory info
-                dir_info = {
-                    'relative_path': relative_path,
-                    'depth': current_depth,
-                    'size_bytes': size_bytes,
-                    'file_count': file_count
-                }
-                directories.append(dir_info)
-
-                # Scan subdirectories if we haven't reached max depth
-                if current_depth < max_depth:
-                    for item in current_path.iterdir():
-                        if item.is_dir():
-                            scan_recursive(item, current_depth + 1)
+            future = completed.get()
+            node = in_flight.pop(future)
 
+            try:
+                node.size_bytes, node.file_count, subdirs, linked_files = future.result()
             except PermissionError:
-                print(f"  ⚠ Permission denied: {current_path}")
+                if node.depth <= max_depth:
+                    permission_errors.append(node.path)
+                subdirs = []
             except OSError as e:
-                print(f"  ⚠ Error accessing {current_path}: {e}")
-
-        # Start scanning from root
-        scan_recursive(root, 0)
-        return directories
-
-    def save_snapshot(self, drive_id: str, drive_info: Dict, directories: List[Dict]):
+                if node.depth <= max_depth:
+                    print(f"  ⚠ Error accessing {node.path}: {e}")
+                subdirs = []
+            else:
+                for name, size, inode_key in linked_files:
+                    file_path = os.path.join(node.path, name)
+                    owner = linked.get(inode_key)
+                    if owner is None or file_path < owner[0]:
+                        linked[inode_key] = (file_path, node.path, size)
+                node.has_links = bool(linked_files)
+
+            node.pending = len(subdirs)
+            waiting.extend((subdir, node.depth + 1, node) for subdir in reversed(subdirs))
+            submit_waiting()
+
+            # Walk up through every ancestor whose subtree is now complete
+            while node is not None and node.pending == 0:
+                if node.depth <= max_depth:
+                    if node.has_links:
+                        deferred[node.path] = node
+                    else:
+                        yield DirInfo(relative_path_of(node.path), node.depth,
+                                      node.size_bytes, node.file_count)
+
+                parent = node.parent
+                if parent is not None:
+                    parent.size_bytes += node.size_bytes
+                    parent.file_count += node.file_count
+                    parent.has_links = parent.has_links or node.has_links
+                    parent.pending -= 1
+                node = parent
+
+        # Charge each hardlinked file to the recorded ancestors of its owner
+        for _file_path, dir_path, size in linked.values():
+            ancestors = [root_path]
+            if dir_path != root_path:
+                parts = dir_path[len(root_prefix):].split(os.sep)
+                for depth in range(1, min(len(parts), max_depth) + 1):
+                    ancestors.append(root_prefix + os.sep.join(parts[:depth]))
+            for path in ancestors:
+                node = deferred[path]
+                node.size_bytes += size
+                node.file_count += 1
+
+        for node in deferred.values():
+            yield DirInfo(relative_path_of(node.path), node.depth,
+                          node.size_bytes, node.file_count)
+
+        if permission_errors:
+            print(f"  ⚠ Permission denied: {len(permission_errors)} director"
+                  f"{'y' if len(permission_errors) == 1 else 'ies'} under {root_path}")
+            for path in permission_errors[:MAX_PERMISSION_ERRORS_SHOWN]:
+                print(f"    {path}")
+            if len(permission_errors) > MAX_PERMISSION_ERRORS_SHOWN:
+                print(f"    ... and {len(permission_errors) - MAX_PERMISSION_ERRORS_SHOWN} more")
+
+    def save_snapshot(self, drive_id: str, drive_info: Dict, directories: Iterable[DirInfo],
+                      scan_date: Optional[str] = None) -> int:
         """
-        Save scan snapshot to JSON file.
+        Save scan snapshot as newline-delimited JSON.
+
+        The first line holds the drive_id, scan_date and drive_info header;
+        each following line is one directory record. Records go to a
+        .partial file that is renamed into place once the scan completes.
 
         Args:
             drive_id: Drive identifier (codename)
             drive_info: Drive information dictionary
-            directories: List of scanned directories
+            directories: Scanned directories, written as they are produced
+            scan_date: ISO timestamp of the scan (defaults to the current time)
+
+        Returns:
+            Number of directory records written
         """
         timestamp = datetime.now().strftime('%Y-%m-%d')
-        filename = f"{drive_id}-{timestamp}.json"
+        filename = f"{drive_id}-{timestamp}.ndjson"
         filepath = SNAPSHOTS_DIR / filename
+        partial_filepath = SNAPSHOTS_DIR / f"{filename}.partial"
 
         SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
 
-        snapshot = {
+        header = {
             'drive_id': drive_id,
-            'scan_date': datetime.utcnow().isoformat() + 'Z',
+            'scan_date': scan_date or utc_timestamp(),
             'drive_info': {
                 'device_identifier': drive_info.get('device_identifier'),
                 'volume_uuid': drive_info.get('volume_uuid'),
@@ -390,22 +956,32 @@ class DriveScanner:
                 'capacity_bytes': drive_info.get('capacity_bytes'),
                 'free_bytes': drive_info.get('free_bytes'),
                 'file_system': drive_info.get('file_system')
-            },
-            'directories': directories
+            }
         }
 
-        with open(filepath, 'w') as f:
-            json.dump(snapshot, f, indent=2)
+        # ensure_ascii escapes surrogate-escaped (non-UTF-8) filenames safely
+        encoder = json.JSONEncoder(separators=(',', ':'))
+        with open(partial_filepath, 'w', encoding='utf-8') as f:
+            f.write(encoder.encode(header))
+            f.write('\n')
+            dir_count = 0
+            for dir_info in directories:
+                f.write(encoder.encode(dir_info._asdict()))
+                f.write('\n')
+                dir_count += 1
+        os.replace(partial_filepath, filepath)
 
         print(f"✓ Snapshot saved: {filename}")
+        return dir_count
 
     def format_bytes(self, bytes_value: int) -> str:
         """Format bytes as human-readable string."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes_value < 1024.0:
-                return f"{bytes_value:.1f} {unit}"
-            bytes_value /= 1024.0
-        return f"{bytes_value:.1f} PB"
+        if bytes_value < 1024:
+            return f"{bytes_value:.1f} B"
+
+        # Each unit is 2**10 of the previous one, so the bit length picks it directly
+        unit = min((int(bytes_value).bit_length() - 1) // 10, len(BYTE_UNITS) - 1)
+        return f"{bytes_value / (1 << (10 * unit)):.1f} {BYTE_UNITS[unit]}"
 
     def print_summary(self, drive_id: str, drive_info: Dict, dir_count: int):
         """Print a friendly summary of the scan."""
@@ -416,6 +992,31 @@ class DriveScanner:
         print(f"✓ {drive_id} — {capacity_tb:.1f} TB, {free_tb:.1f} TB free, {dir_count} directories scanned")
         print(f"{'─'*60}\n")
 
+    def _scan_one(self, drive_id: str, drive_info: Dict, now: str) -> int:
+        """
+        Scan a single drive, save its snapshot and update the registry.
+
+        Args:
+            drive_id: Drive identifier (codename)
+            drive_info: Drive information dictionary
+            now: ISO timestamp of this scan run
+
+        Returns:
+            Number of directories scanned
+        """
+        directories = self.scan_directory_tree(
+            drive_info['mount_point'],
+            max_depth=2
+        )
+
+        # Save snapshot, streaming directories to disk as they are scanned
+        dir_count = self.save_snapshot(drive_id, drive_info, directories, scan_date=now)
+
+        # Update last_scanned timestamp
+        self.update_last_scanned(drive_id, now=now)
+
+        return dir_count
+
     def scan_all_drives(self):
         """Main method to scan all external drives."""
         print("ARCHIVIS Phase 1: External Drive Scanner")
@@ -431,50 +1032,79 @@ class DriveScanner:
 
         print(f"Found {len(drives)} external drive(s)\n")
 
-        # Process each drive
-        for drive_info in drives:
-            print(f"\nProcessing: {drive_info['volume_name']}")
-            print(f"Device: {drive_info['device_identifier']}")
-            print(f"Mount point: {drive_info['mount_point']}")
+        # All registry and snapshot timestamps for this run share the start time
+        scan_start = utc_timestamp()
 
-            # Check if drive exists in registry
-            existing_entry = self.find_drive_in_registry(drive_info)
-
-            if existing_entry:
-                drive_id = existing_entry['id']
-                print(f"✓ Known drive: {drive_id}")
-            else:
-                # New drive - assign name
-                capacity_tb = drive_info['capacity_bytes'] / (1024 ** 4)
-                proposed_name = self._get_available_name(drive_info['capacity_bytes'])
-
-                if not proposed_name:
-                    print("Error: No available names. Please update naming_rules.json")
-                    continue
-
-                # Get user confirmation
-                confirmed_name = self._confirm_name(proposed_name, capacity_tb)
+        # Identify or register each drive first; name prompts stay serial.
+        # New registrations are saved before scanning, last_scanned after.
+        try:
+            pending = []
+            for drive_info in drives:
+                print(f"\nProcessing: {drive_info['volume_name']}")
+                print(f"Device: {drive_info['device_identifier']}")
+                print(f"Mount point: {drive_info['mount_point']}")
+
+                # Check if drive exists in registry
+                existing_entry = self.find_drive_in_registry(drive_info)
+
+                if existing_entry:
+                    drive_id = existing_entry['id']
+                    print(f"✓ Known drive: {drive_id}")
+                else:
+                    # New drive - assign name
+                    capacity_tb = drive_info['capacity_bytes'] / (1024 ** 4)
+                    proposed_name = self._get_available_name(drive_info['capacity_bytes'])
+
+                    if not proposed_name:
+                        print("Error: No available names. Please update naming_rules.json")
+                        continue
 
-                # Register the drive
-                drive_id = self.register_new_drive(drive_info, confirmed_name)
+                    # Get user confirmation
+                    confirmed_name = self._confirm_name(proposed_name, capacity_tb)
 
-            # Perform scan
-            print(f"\nScanning {drive_id}...")
-            print("(This may take a few minutes for large drives)")
+                    # Register the drive
+                    drive_id = self.register_new_drive(drive_info, confirmed_name, now=scan_start)
 
-            directories = self.scan_directory_tree(
-                drive_info['mount_point'],
-                max_depth=2
-            )
+                pending.append((drive_id, drive_info))
 
-            # Save snapshot
-            self.save_snapshot(drive_id, drive_info, directories)
+            # Persist new codenames now rather than after hours of scanning
+            self._flush_registry()
 
-            # Update last_scanned timestamp
-            self.update_last_scanned(drive_id)
+            if pending:
+                # Scan independent drives concurrently
+                print(f"\nScanning {', '.join(drive_id for drive_id, _ in pending)}...")
+                print("(This may take a few minutes for large drives)")
 
-            # Print summary
-            self.print_summary(drive_id, drive_info, len(directories))
+                executor = ThreadPoolExecutor(max_workers=len(pending))
+                futures = {}
+                try:
+                    for drive_id, drive_info in pending:
+                        future = executor.submit(self._scan_one, drive_id, drive_info, scan_start)
+                        futures[future] = (drive_id, drive_info)
+
+                    for future in as_completed(futures):
+                        drive_id, drive_info = futures[future]
+                        try:
+                            dir_count = future.result()
+                        except Exception as e:
+                            # A failure on one drive must not lose the others' results
+                            print(f"Error scanning {drive_id}: {e}")
+                            continue
+
+                        # Print summary
+                        self.print_summary(drive_id, drive_info, dir_count)
+                except KeyboardInterrupt:
+                    # Stop running scans at their next directory instead of
+                    # waiting for every drive to finish
+                    self._cancel_event.set()
+                    for future in futures:
+                        future.cancel()
+                    print("\nScan interrupted; unfinished snapshots were left as .partial files.")
+                    raise
+                finally:
+                    executor.shutdown(wait=False)
+        finally:
+            self._flush_registry()
 
         print("\n" + "=" * 60)
         print("Scan complete!")